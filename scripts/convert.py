@@ -11,147 +11,568 @@ Usage:
 """
 
 import argparse
+import asyncio
 import os
+import re
 import shutil
-import subprocess
+import struct
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
 
-SUPPORTED_EXTS = {
-    ".mp3", ".m4a", ".aac", ".flac", ".ogg", ".opus", ".wma", ".wv",
-    ".aif", ".aiff", ".aifc", ".mp2", ".ac3", ".mka", ".mkv", ".mp4", ".m4b", ".wav"
-}
+# Optional: convert in-process with PyAV (--pyav) instead of one ffmpeg per file
+try:
+    import av
+except Exception:
+    av = None
+
+# Lowercase, without the leading dot (matched against the raw directory entry name)
+SUPPORTED_EXTS = frozenset({
+    "mp3", "m4a", "aac", "flac", "ogg", "opus", "wma", "wv",
+    "aif", "aiff", "aifc", "mp2", "ac3", "mka", "mkv", "mp4", "m4b", "wav"
+})
+MAX_EXT_LEN = max(map(len, SUPPORTED_EXTS))
+
+# Max allowed |input - output| duration (seconds) before an original is kept
+DURATION_TOLERANCE = 0.5
+
+# Paths the directory walker may run ahead of the converters
+QUEUE_SIZE = 2048
+
+DURATION_RE = re.compile(r"Duration:\s*(?:(\d+):(\d+):(\d+(?:\.\d+)?)|N/A)")
+# A real video stream (cover art in music files is an "attached pic")
+VIDEO_STREAM_RE = re.compile(r"^\s+Stream #.*: Video: (?!.*\(attached pic\))")
 
 def have_tool(name: str) -> bool:
     return shutil.which(name) is not None
 
-def run(cmd: list[str]) -> subprocess.CompletedProcess:
-    return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+def iter_audio(root: str, exts: frozenset[str]) -> Iterator[str]:
+    """Yield paths of files under root whose (dotless, lowercase) extension is in exts.
+
+    Uses os.scandir so file/dir checks come from the directory entry (no extra
+    stat per file). Each directory is listed completely before its files are
+    yielded, so outputs written next to a source are never picked up mid-scan.
+    """
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for e in entries:
+            if e.is_dir(follow_symlinks=False):
+                stack.append(e.path)
+            elif e.is_file(follow_symlinks=False):
+                name = e.name
+                i = name.rfind(".")
+                # Dotfiles have no extension; only lowercase short ASCII ones (longer can't match)
+                if i <= 0 or len(name) - i - 1 > MAX_EXT_LEN:
+                    continue
+                ext = name[i + 1:]
+                if ext.isascii() and ext.lower() in exts:
+                    yield e.path
+
+async def run(cmd: list[str]) -> tuple[int, str, str]:
+    """Run a command without blocking the event loop; return (returncode, stdout, stderr)."""
+    p = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    out, err = await p.communicate()  # drains both pipes, so a chatty ffmpeg can't block on a full one
+    return p.returncode, out.decode(errors="replace"), err.decode(errors="replace")
+
+XBOXSAFE_OUTPUT_ARGS = [
+    "-acodec", "pcm_s16le",  # 16-bit PCM LE
+    "-ac", "1",              # mono
+    "-ar", "44100",          # 44.1 kHz
+    "-map_metadata", "-1",   # strip all metadata
+    "-f", "wav",             # force WAV muxer (works for temp files)
+]
 
-def ffmpeg_xboxsafe_cmd(src: Path, dst: Path, overwrite: bool) -> list[str]:
+def ffmpeg_threads_args(single_thread: bool) -> list[str]:
+    # When several ffmpegs run at once, each would otherwise start a thread per
+    # core for decoding/resampling and oversubscribe the CPU; pin them to 1:1
+    return ["-filter_threads", "1", "-threads", "1"] if single_thread else []
+
+def ffmpeg_xboxsafe_cmd(src: Path, dst: Path, overwrite: bool, verify: bool = False,
+                        single_thread: bool = False) -> list[str]:
+    # With verify, ffmpeg logs the input header (Duration:) on stderr; the output
+    # duration is read back from the WAV header — no separate ffprobe runs.
     return [
-        "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin",
+        "ffmpeg", "-hide_banner", "-loglevel", "info" if verify else "error", "-nostdin", "-nostats",
+        *ffmpeg_threads_args(single_thread),
         "-i", str(src),
-        "-acodec", "pcm_s16le",  # 16-bit PCM LE
-        "-ac", "1",              # mono
-        "-ar", "44100",          # 44.1 kHz
-        "-map_metadata", "-1",   # strip all metadata
-        "-f", "wav",             # force WAV muxer (works for temp files)
+        *XBOXSAFE_OUTPUT_ARGS,
         "-y" if overwrite else "-n",
         str(dst),
     ]
 
-def convert_other_to_wav(src: Path, dst: Path, overwrite: bool) -> tuple[bool, str]:
-    p = run(ffmpeg_xboxsafe_cmd(src, dst, overwrite))
-    ok = (p.returncode == 0) and dst.exists()
-    return ok, p.stderr.strip()
+def ffmpeg_xboxsafe_batch_cmd(pairs: list[tuple[Path, Path]], verify: bool = False,
+                              single_thread: bool = False) -> list[str]:
+    # One ffmpeg for many files: input k is mapped to output k
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "info" if verify else "error", "-nostdin", "-nostats"]
+    if single_thread:
+        cmd += ["-filter_threads", "1"]
+    for src, _ in pairs:
+        cmd += [*(["-threads", "1"] if single_thread else []), "-i", str(src)]
+    for k, (_, dst) in enumerate(pairs):
+        cmd += ["-map", f"{k}:a:0", *XBOXSAFE_OUTPUT_ARGS, "-y", str(dst)]
+    return cmd
+
+def parse_duration(m: re.Match) -> float | None:
+    if m[1] is None:  # Duration: N/A
+        return None
+    return int(m[1]) * 3600 + int(m[2]) * 60 + float(m[3])
+
+def input_durations(stderr: str) -> list[float | None]:
+    """Durations of each "Input #k" in ffmpeg's info log, in order.
+
+    The container Duration: is only a fair check of the audio when there's no
+    video stream (the video may run longer) and ffmpeg didn't estimate it from
+    the bitrate (VBR mp3 without a Xing header); otherwise that input gets None.
+    """
+    durs: list[float | None] = []
+    estimated = False  # logged while probing, i.e. before the input's dump
+    trusted = in_dump = False
+    for line in stderr.splitlines():
+        if line.startswith("Input #"):
+            durs.append(None)
+            trusted, in_dump, estimated = not estimated, True, False
+        elif not line.startswith(" "):
+            in_dump = False
+            estimated |= "Estimating duration" in line
+        elif in_dump:
+            if VIDEO_STREAM_RE.match(line):
+                trusted = False
+                durs[-1] = None
+            elif trusted and (m := DURATION_RE.search(line)):
+                durs[-1] = parse_duration(m)
+    return durs
+
+async def run_ffmpeg(cmd: list[str], verify: bool) -> tuple[int, str, float | None]:
+    """Run ffmpeg once; return (returncode, error text, input duration or None)."""
+    rc, _, stderr = await run(cmd)
+    in_durs = input_durations(stderr)
+    in_dur = in_durs[0] if in_durs else None
+    err = stderr.strip()
+    if rc != 0 and verify:
+        # info-level log is mostly the stream dump; the failure is on the last line
+        err = err.splitlines()[-1] if err else ""
+    return rc, err, in_dur
 
-def normalize_wav_inplace(src: Path) -> tuple[bool, str]:
-    # Write to a .wav temp, then atomically replace the original
-    tmp = src.with_name(src.name + ".x360tmp.wav")
+def convert_pyav(src: str, dst: str) -> tuple[int, str, float | None]:
+    """In-process equivalent of ffmpeg_xboxsafe_cmd (runs in a worker process).
+
+    Returns (returncode, error text, input duration or None) like run_ffmpeg.
+    Metadata is never copied to the output.
+    """
+    try:
+        with av.open(src) as inp:
+            if not inp.streams.audio:
+                return 1, "no audio stream in input", None
+            istream = inp.streams.audio[0]
+            with av.open(dst, "w", format="wav") as out:
+                ostream = out.add_stream("pcm_s16le", rate=44100)
+                ostream.layout = "mono"
+                resampler = av.AudioResampler(format="s16", layout="mono", rate=44100)
+                for frame in inp.decode(istream):
+                    for rframe in resampler.resample(frame):
+                        out.mux(ostream.encode(rframe))
+                for rframe in resampler.resample(None):  # flush buffered samples
+                    out.mux(ostream.encode(rframe))
+                out.mux(ostream.encode(None))
+            # The audio stream's own length; the container's may cover a longer video
+            in_dur = float(istream.duration * istream.time_base) if istream.duration is not None else None
+    except Exception as e:  # PyAV errors may not pickle back to the parent; send text
+        return 1, str(e) or type(e).__name__, None
+    return 0, "", in_dur
+
+async def run_pyav(pool: Executor, src: Path, dst: Path) -> tuple[int, str, float | None]:
+    return await asyncio.get_running_loop().run_in_executor(pool, convert_pyav, str(src), str(dst))
+
+def wav_info(path: Path) -> tuple[tuple[int, int, int, int], int, bool] | None:
+    """Read a WAV's chunk headers without decoding anything.
+
+    Returns ((format_code, channels, sample_rate, bits), data_size, has_metadata),
+    or None if this isn't a RIFF/WAVE file with fmt and data chunks.
+    """
+    fmt = data_size = None
+    has_metadata = False
+    try:
+        with open(path, "rb") as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+                return None
+            while True:
+                hdr = f.read(8)
+                if len(hdr) < 8:
+                    break
+                cid, size = hdr[:4], struct.unpack("<I", hdr[4:])[0]
+                skip = size + (size & 1)  # chunks are word-aligned
+                if cid == b"fmt " and size >= 16:
+                    body = f.read(16)
+                    if len(body) < 16:  # truncated file: let ffmpeg deal with it
+                        return None
+                    fmt = struct.unpack("<HHIIHH", body)
+                    skip -= 16
+                elif cid == b"data":
+                    data_size = size
+                elif cid == b"LIST" and size <= 4096:
+                    # ffmpeg's own output carries LIST/INFO with just ISFT (encoder); that's fine
+                    body = f.read(size)
+                    skip -= len(body)
+                    has_metadata |= not _is_encoder_only_info(body)
+                else:
+                    has_metadata = True  # id3, bext, cue, big LIST, ...
+                f.seek(skip, os.SEEK_CUR)
+    except OSError:
+        return None
+    if fmt is None or data_size is None:
+        return None
+    code, channels, rate, _, _, bits = fmt
+    return (code, channels, rate, bits), data_size, has_metadata
+
+def wav_duration(path: Path) -> float | None:
+    """Duration from the header: data bytes / (rate × channels × bytes per sample)."""
+    info = wav_info(path)
+    if info is None:
+        return None
+    (_, channels, rate, bits), data_size, _ = info
+    frame = channels * bits // 8
+    return data_size / (rate * frame) if rate and frame else None
+
+def _is_encoder_only_info(body: bytes) -> bool:
+    if body[:4] != b"INFO":
+        return False
+    pos = 4
+    while pos + 8 <= len(body):
+        sid, size = body[pos:pos + 4], struct.unpack("<I", body[pos + 4:pos + 8])[0]
+        if sid != b"ISFT":
+            return False
+        pos += 8 + size + (size & 1)
+    return True
+
+def needs_normalize(path: Path) -> bool:
+    """False if the .wav is already PCM 16-bit, mono, 44.1 kHz with no metadata chunks."""
+    info = wav_info(path)
+    return info is None or info[0] != (1, 1, 44100, 16) or info[2]
+
+def duration_mismatch(in_dur: float | None, out_dur: float | None) -> str:
+    if in_dur is None or out_dur is None or abs(in_dur - out_dur) <= DURATION_TOLERANCE:
+        return ""
+    return f"duration mismatch (in {in_dur:.2f}s, out {out_dur:.2f}s)"
+
+def tmp_path(dst: Path) -> Path:
+    """Scratch .wav next to dst; the conversion lands here until it has been verified."""
+    return dst.with_name(dst.name + ".x360tmp.wav")
+
+def _discard_output(path: Path):
+    """Remove a failed or unverified scratch WAV, so a rerun doesn't mistake it for a result."""
+    try:
+        path.unlink()
+    except Exception:
+        pass
+
+async def convert_via_tmp(src: Path, dst: Path, verify: bool = True, single_thread: bool = False,
+                          pool: Executor | None = None) -> tuple[bool, str]:
+    # Write to a .wav temp, then atomically replace dst: an existing dst (or src
+    # itself, when normalizing in place) is only touched once the output checks out
+    tmp = tmp_path(dst)
     try:
         if tmp.exists():
             tmp.unlink()
-        p = run(ffmpeg_xboxsafe_cmd(src, tmp, True))  # allow overwrite of tmp
-        if p.returncode != 0 or not tmp.exists():
-            if tmp.exists():
-                try:
-                    tmp.unlink()
-                except Exception:
-                    pass
-            return False, p.stderr.strip()
-        os.replace(tmp, src)  # atomic replace
+        # allow overwrite of tmp
+        if pool is not None:
+            rc, err, in_dur = await run_pyav(pool, src, tmp)
+        else:
+            rc, err, in_dur = await run_ffmpeg(ffmpeg_xboxsafe_cmd(src, tmp, True, verify, single_thread), verify)
+        if rc == 0 and tmp.exists():
+            err = duration_mismatch(in_dur, wav_duration(tmp)) if verify else ""
+        elif not err:
+            err = "ffmpeg produced no output"
+        if err:
+            _discard_output(tmp)
+            return False, err
+        os.replace(tmp, dst)  # atomic replace
         return True, ""
     except Exception as e:
-        try:
-            tmp.unlink()
-        except Exception:
-            pass
+        _discard_output(tmp)
         return False, str(e)
 
-def main():
-    ap = argparse.ArgumentParser(description="Convert audio to Xbox-safe WAV (16-bit, mono, 44.1 kHz, no metadata).")
-    ap.add_argument("root", nargs="?", default=".", help="Root directory to scan")
-    ap.add_argument("--keep", action="store_true", help="Keep originals (for non-wav sources)")
-    ap.add_argument("--overwrite", action="store_true", help="Overwrite/normalize existing .wav files in place")
-    ap.add_argument("--dry-run", action="store_true", help="Preview actions; make no changes")
-    args = ap.parse_args()
+async def convert_other_to_wav(src: Path, dst: Path, overwrite: bool, verify: bool = True,
+                               single_thread: bool = False, pool: Executor | None = None) -> tuple[bool, str]:
+    if not overwrite and dst.exists():
+        return False, f"{dst} already exists"
+    return await convert_via_tmp(src, dst, verify, single_thread, pool)
 
-    if not have_tool("ffmpeg"):
-        print("ERROR: 'ffmpeg' not found in PATH. Install ffmpeg.")
-        return
+async def normalize_wav_inplace(src: Path, verify: bool = True, single_thread: bool = False,
+                                pool: Executor | None = None) -> tuple[bool, str]:
+    return await convert_via_tmp(src, src, verify, single_thread, pool)
 
-    root = Path(args.root).resolve()
-    if not root.exists():
-        print(f"ERROR: Path not found: {root}")
-        return
+def _delete_original(src: Path, messages: list[str]) -> tuple[int, int]:
+    """Unlink a converted original; returns (deleted, errors)."""
+    try:
+        src.unlink()
+        messages.append(f"[delete] {src}")
+        return 1, 0
+    except Exception as e:
+        messages.append(f"[error] Couldn’t delete {src}: {e}")
+        return 0, 1
 
-    to_process: list[Path] = []
-    for p in root.rglob("*"):
-        if p.is_file() and p.suffix.lower() in SUPPORTED_EXTS:
-            to_process.append(p)
+async def _process_one(src: Path, args: argparse.Namespace,
+                       pool: Executor | None = None) -> tuple[int, int, int, list[str]]:
+    """Convert or normalize one file (with PyAV on pool if given, else ffmpeg).
 
-    print(f"Scanning: {root}")
-    print(f"Found {len(to_process)} audio file(s).")
+    Returns (converted, deleted, errors, messages); messages are printed by the caller.
+    """
+    messages: list[str] = []
+
+    if src.suffix.lower() == ".wav":
+        ok, err = await normalize_wav_inplace(src, verify=not args.fast, single_thread=args.jobs > 1, pool=pool)
+        if not ok:
+            messages.append(f"[error] {src}: {err}")
+            return 0, 0, 1, messages
+        return 1, 0, 0, messages
+
+    dst = src.with_suffix(".wav")
+    # allow overwrite for the target
+    ok, err = await convert_other_to_wav(src, dst, True, verify=not args.fast,
+                                         single_thread=args.jobs > 1, pool=pool)
+    if not ok:
+        messages.append(f"[error] {src}: {err}")
+        return 0, 0, 1, messages
+
+    if args.keep:
+        return 1, 0, 0, messages
+    deleted, errors = _delete_original(src, messages)
+    return 1, deleted, errors, messages
+
+async def _process_batch(srcs: list[Path], args: argparse.Namespace,
+                         pool: Executor | None = None) -> tuple[int, int, int, list[str]]:
+    """Convert several non-WAV files with a single ffmpeg process.
+
+    Falls back to one ffmpeg per file if the batch fails. Same return shape as _process_one.
+    """
+    verify = not args.fast
+    pairs = [(src, src.with_suffix(".wav")) for src in srcs]
+    if len({dst for _, dst in pairs}) != len(pairs):
+        # One ffmpeg would write both outputs to the same file and report success for each
+        raise ValueError("batch contains two sources with the same output .wav")
+    # As in convert_via_tmp, outputs only replace an existing .wav once verified
+    tmps = [tmp_path(dst) for _, dst in pairs]
+    cmd = ffmpeg_xboxsafe_batch_cmd(list(zip(srcs, tmps)), verify, single_thread=args.jobs > 1)
+    rc, _, stderr = await run(cmd)
+    if rc != 0:
+        for tmp in tmps:
+            _discard_output(tmp)
+        converted = deleted = errors = 0
+        messages: list[str] = []
+        for src in srcs:
+            c, d, e, msgs = await _process_one(src, args)
+            converted += c
+            deleted += d
+            errors += e
+            messages += msgs
+        return converted, deleted, errors, messages
+
+    # One entry per "Input #k" dump, so the k-th duration belongs to input k
+    in_durs = input_durations(stderr) if verify else []
+    converted = deleted = errors = 0
+    messages = []
+    for k, ((src, dst), tmp) in enumerate(zip(pairs, tmps)):
+        if not tmp.exists():
+            messages.append(f"[error] {src}: ffmpeg produced no output")
+            errors += 1
+            continue
+        if verify and len(in_durs) == len(pairs):
+            mismatch = duration_mismatch(in_durs[k], wav_duration(tmp))
+            if mismatch:
+                _discard_output(tmp)
+                messages.append(f"[error] {src}: {mismatch}")
+                errors += 1
+                continue
+        try:
+            os.replace(tmp, dst)
+        except OSError as e:
+            _discard_output(tmp)
+            messages.append(f"[error] {src}: {e}")
+            errors += 1
+            continue
+        converted += 1
+        if not args.keep:
+            d, e = _delete_original(src, messages)
+            deleted += d
+            errors += e
+    return converted, deleted, errors, messages
+
+async def convert_tree(root: Path, args: argparse.Namespace, totals: Counter[str],
+                       pool: Executor | None = None):
+    """Walk root on a thread while --jobs workers convert what it finds.
+
+    The walker feeds a bounded queue, so memory stays flat however large the tree
+    is and the first conversion starts as soon as the first file turns up.
+    With a pool, files are converted by PyAV in its worker processes.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=QUEUE_SIZE)
+    workers = max(1, args.jobs)
+    # Every .wav a job has been given to write. Only the event loop touches it, so
+    # two sources (song.mp3 + song.flac, or song.wav normalized in place) can never
+    # race for one output; the later one is skipped as in a serial run.
+    claimed: set[Path] = set()
 
-    converted = deleted = skipped = errors = 0
+    def claim(src: Path, dst: Path) -> bool:
+        if dst in claimed:
+            print(f"[skip] {src}: {dst} is already the output of another file")
+            totals["skipped"] += 1
+            return False
+        claimed.add(dst)
+        return True
 
-    for src in to_process:
-        ext = src.suffix.lower()
+    # Set when the run ends early (Ctrl-C); asyncio.run waits for the walker thread,
+    # so it must not stay blocked on a full queue nobody will drain again
+    stop = threading.Event()
 
-        if ext == ".wav":
+    def put(item: str | None) -> bool:
+        """Queue item from the walker thread; False if the run was stopped meanwhile."""
+        fut = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while not stop.is_set():
+            try:
+                fut.result(timeout=0.2)
+                return True
+            except FutureTimeoutError:
+                pass
+        fut.cancel()
+        return False
+
+    def walk():
+        try:
+            for path in iter_audio(str(root), SUPPORTED_EXTS):
+                if not put(path):
+                    return
+        finally:
+            for _ in range(workers):  # one end-of-walk sentinel per worker
+                if stop.is_set() or not put(None):
+                    break
+
+    async def run_job(process, item):
+        try:
+            converted, deleted, errors, messages = await process(item, args, pool)
+        except Exception as e:
+            converted, deleted, errors, messages = 0, 0, 1, [f"[error] {item}: {e}"]
+        totals.update(converted=converted, deleted=deleted, errors=errors)
+        for msg in messages:
+            print(msg)
+
+    async def handle(src: Path, batch: list[Path]):
+        """Skip, preview, or convert one file; non-WAV files may be queued into batch."""
+        if src.suffix.lower() == ".wav":
             if not args.overwrite:
                 print(f"[skip] {src} exists (use --overwrite to normalize in place)")
-                skipped += 1
-                continue
+                totals["skipped"] += 1
+                return
+            if not needs_normalize(src):
+                print(f"[skip] {src} is already Xbox-safe")
+                totals["skipped"] += 1
+                return
+            if not claim(src, src):
+                return
 
             print(f"[normalize] {src} (mono/44.1k/16-bit/no-metadata)")
             if args.dry_run:
-                converted += 1
-                continue
-
-            ok, err = normalize_wav_inplace(src)
-            if not ok:
-                print(f"[error] {src}: {err}")
-                errors += 1
-            else:
-                converted += 1
-            continue
+                totals["converted"] += 1
+                return
+            await run_job(_process_one, src)
+            return
 
         # Non-WAV → convert to WAV (Xbox-safe)
         dst = src.with_suffix(".wav")
         if dst.exists() and not args.overwrite:
             print(f"[skip] {dst} exists (use --overwrite to replace)")
-            skipped += 1
-            continue
+            totals["skipped"] += 1
+            return
+        if not claim(src, dst):
+            return
 
         print(f"[convert] {src} → {dst}")
         if args.dry_run:
-            converted += 1
+            totals["converted"] += 1
             if not args.keep:
-                deleted += 1
-            continue
+                totals["deleted"] += 1
+            return
+        if args.batch > 1 and pool is None:  # PyAV has no per-file startup to amortize
+            batch.append(src)  # dst was claimed above, so no two batch entries share it
+            if len(batch) >= args.batch:
+                await run_job(_process_batch, batch[:])
+                batch.clear()
+        else:
+            await run_job(_process_one, src)
 
-        ok, err = convert_other_to_wav(src, dst, True)  # allow overwrite for the target
-        if not ok:
-            print(f"[error] {src}: {err}")
-            errors += 1
-            continue
-
-        converted += 1
-        if not args.keep:
+    async def worker():
+        batch: list[Path] = []  # non-WAV conversions grouped by --batch
+        while (path := await queue.get()) is not None:
+            totals["found"] += 1
             try:
-                src.unlink()
-                deleted += 1
-                print(f"[delete] {src}")
-            except Exception as e:
-                print(f"[error] Couldn’t delete {src}: {e}")
-                errors += 1
+                await handle(Path(path), batch)
+            except Exception as e:  # keep consuming, or the walker would block on a full queue
+                print(f"[error] {path}: {e}")
+                totals["errors"] += 1
+        if batch:
+            await run_job(_process_batch, batch)
+
+    try:
+        await asyncio.gather(asyncio.to_thread(walk), *(worker() for _ in range(workers)))
+    finally:
+        stop.set()
+
+def main():
+    ap = argparse.ArgumentParser(description="Convert audio to Xbox-safe WAV (16-bit, mono, 44.1 kHz, no metadata).")
+    ap.add_argument("root", nargs="?", default=".", help="Root directory to scan")
+    ap.add_argument("--keep", action="store_true", help="Keep originals (for non-wav sources)")
+    ap.add_argument("--overwrite", action="store_true", help="Overwrite/normalize existing .wav files in place")
+    ap.add_argument("--dry-run", action="store_true", help="Preview actions; make no changes")
+    ap.add_argument("--fast", action="store_true",
+                    help="Skip the input/output duration check before deleting or replacing originals")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                    help="Number of parallel ffmpeg processes (default: CPU count)")
+    ap.add_argument("--batch", type=int, default=1,
+                    help="Convert up to N files per ffmpeg process to amortize startup (default: 1)")
+    ap.add_argument("--pyav", action="store_true",
+                    help="Convert in-process with PyAV (pip install av) instead of running ffmpeg per file")
+    args = ap.parse_args()
+
+    if args.pyav:
+        if av is None:
+            print("ERROR: PyAV not available. Install with: pip install av")
+            return
+    elif not have_tool("ffmpeg"):
+        print("ERROR: 'ffmpeg' not found in PATH. Install ffmpeg.")
+        return
+
+    root = Path(args.root).resolve()
+    if not root.exists():
+        print(f"ERROR: Path not found: {root}")
+        return
+
+    print(f"Scanning: {root}")
+
+    totals: Counter[str] = Counter()
+    if args.pyav:
+        with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            asyncio.run(convert_tree(root, args, totals, pool))
+    else:
+        asyncio.run(convert_tree(root, args, totals))
+
+    print(f"Found {totals['found']} audio file(s).")
 
     print("\n=== Summary ===")
-    print(f"Converted/normalized: {converted}")
-    print(f"Deleted originals:    {deleted}")
-    print(f"Skipped:              {skipped}")
-    print(f"Errors:               {errors}")
+    print(f"Converted/normalized: {totals['converted']}")
+    print(f"Deleted originals:    {totals['deleted']}")
+    print(f"Skipped:              {totals['skipped']}")
+    print(f"Errors:               {totals['errors']}")
 
 if __name__ == "__main__":
     main()
@@ -1,44 +1,94 @@
 #!/usr/bin/env python3
 """
 Move all files from subfolders into the root directory recursively.
-- Skips venv/ and hidden folders
+- Skips venv/, __pycache__/ and hidden folders
 - Adds _1, _2, ... if duplicate names exist
 - Prints a summary at the end
 """
 
+import errno
 import os
 import shutil
 
-def unique_path(dest_dir, filename):
-    """Return a unique path by appending _1, _2, etc. if needed."""
+SKIP_DIRS = {"venv", "__pycache__"}
+
+# Renames go through *at syscalls relative to open directory fds (os.fwalk), so the
+# kernel doesn't re-resolve every path component per file. Not available on Windows.
+USE_DIR_FD = hasattr(os, "fwalk") and os.rename in os.supports_dir_fd
+
+def walk(root):
+    """os.walk that also yields each directory's fd (None without dir_fd support)."""
+    if USE_DIR_FD:
+        yield from os.fwalk(root)
+    else:
+        for dirpath, dirnames, files in os.walk(root):
+            yield dirpath, dirnames, files, None
+
+def name_taken(dest_dir, candidate, existing, folded):
+    """True if candidate is already in dest_dir.
+
+    A name that only differs in case is the same file on case-insensitive
+    filesystems (FAT32/exFAT, macOS, Windows), so only then is the disk asked.
+    """
+    if candidate in existing:
+        return True
+    return candidate.casefold() in folded and os.path.exists(os.path.join(dest_dir, candidate))
+
+def unique_path(dest_dir, filename, existing, folded):
+    """Return a unique path by appending _1, _2, etc. if needed.
+
+    `existing` holds the names already in dest_dir (built once with
+    os.listdir) and `folded` their casefolded forms, so no stat() is needed
+    per candidate.
+    """
     base, ext = os.path.splitext(filename)
-    candidate = os.path.join(dest_dir, filename)
+    candidate = filename
     i = 1
-    while os.path.exists(candidate):
-        candidate = os.path.join(dest_dir, f"{base}_{i}{ext}")
+    while name_taken(dest_dir, candidate, existing, folded):
+        candidate = f"{base}_{i}{ext}"
         i += 1
-    return candidate
+    return os.path.join(dest_dir, candidate)
 
 def flatten_to_root(root):
     total = 0
     root = os.path.abspath(root)
     script_name = os.path.basename(__file__)
+    existing = set(os.listdir(root))
+    folded = {name.casefold() for name in existing}
+    root_fd = os.open(root, os.O_RDONLY) if USE_DIR_FD else None
 
-    for dirpath, _, files in os.walk(root):
-        # Skip root dir and venv
-        if dirpath == root or "venv" in dirpath:
-            continue
-        for file in files:
-            if file.startswith(".") or file == script_name:
+    try:
+        for dirpath, dirnames, files, dir_fd in walk(root):
+            # Prune venv/hidden subtrees in place so the walk never descends into them
+            dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS]
+            if dirpath == root:
                 continue
-            src = os.path.join(dirpath, file)
-            dest = unique_path(root, file)
-            try:
-                shutil.move(src, dest)
-                print(f"Moved: {src} → {dest}")
-                total += 1
-            except Exception as e:
-                print(f"Error moving {src}: {e}")
+            for file in files:
+                if file.startswith(".") or file == script_name:
+                    continue
+                src = os.path.join(dirpath, file)
+                dest = unique_path(root, file, existing, folded)
+                dest_name = os.path.basename(dest)
+                try:
+                    try:
+                        # same filesystem: a single rename(2)/renameat(2)
+                        if dir_fd is None:
+                            os.rename(src, dest)
+                        else:
+                            os.rename(file, dest_name, src_dir_fd=dir_fd, dst_dir_fd=root_fd)
+                    except OSError as e:
+                        if e.errno != errno.EXDEV:
+                            raise
+                        shutil.move(src, dest)  # cross-device: copy + unlink
+                    existing.add(dest_name)
+                    folded.add(dest_name.casefold())
+                    print(f"Moved: {src} → {dest}")
+                    total += 1
+                except Exception as e:
+                    print(f"Error moving {src}: {e}")
+    finally:
+        if root_fd is not None:
+            os.close(root_fd)
 
     print(f"\n✅ Done! {total} files moved to {root}")
 
@@ -2,47 +2,109 @@
 import os
 import re
 
+# Optional: google-re2 compiles these patterns to a linear-time DFA.
+# Patterns below stick to the syntax both engines share (inline flags, no VERBOSE).
+try:
+    import re2 as regex
+except Exception:
+    regex = re
+
+# Optional: pyahocorasick finds every literal tag token in one linear pass
+try:
+    import ahocorasick
+except Exception:
+    ahocorasick = None
+
 # ---- SETTINGS ----
 MAX_FILENAME = 42           # FATX filename limit (includes extension)
 BASE_DIR = os.getcwd()      # work in the folder you run the script from
 
 # Remove ANY [ ... ] tag (GoodTools-style)
-BRACKETS = re.compile(r"\s*\[[^\]]*\]")
-
-# Remove ( ... ) when it contains any of these tokens (region/lang/rev/etc.)
-PARENS_WITH_TAGS = re.compile(
-    r"""
-    \s*\(
-        [^)]*
-        (?:USA|Japan|World|Europe|PAL|NTSC|
-           JPN|U|E|
-           Eng(?:lish)?|En|Fr|De|Es|It|Nl|Pt|Sv|No|Ja|
-           Rev(?:\s*\d+|[A-Z])?|
-           Proto|Beta|Unl|Arcade|Demo|Sample|Alt\s*\d+|
-           v\d+(?:\.\d+)?|
-           (?:[A-Z]{2})(?:,[A-Z]{2})+   # En,Fr,De style lists
-        )
-        [^)]*
-    \)
-    """,
-    re.IGNORECASE | re.VERBOSE,
+BRACKETS = regex.compile(r"\s*\[[^\]]*\]")
+
+# Region/lang/rev/etc. tokens that mark a ( ... ) group for removal (case-insensitive)
+TAG_TOKENS = [
+    "USA", "Japan", "World", "Europe", "PAL", "NTSC",
+    "JPN", "U", "E",
+    r"Eng(?:lish)?", "En", "Fr", "De", "Es", "It", "Nl", "Pt", "Sv", "No", "Ja",
+    r"Rev(?:\s*\d+|[A-Z])?",
+    "Proto", "Beta", "Unl", "Arcade", "Demo", "Sample", r"Alt\s*\d+",
+    r"v\d+(?:\.\d+)?",
+    r"(?:[A-Z]{2})(?:,[A-Z]{2})+",  # En,Fr,De style lists
+]
+
+# The same tokens split for the Aho-Corasick path: plain words go in the automaton,
+# the few that need a pattern are checked with TAG_PATTERNS.
+# Eng/English and Rev A/Rev 2 are covered by their "En"/"Rev" prefixes.
+TAG_WORDS = [
+    "USA", "Japan", "World", "Europe", "PAL", "NTSC", "JPN", "U", "E",
+    "En", "Fr", "De", "Es", "It", "Nl", "Pt", "Sv", "No", "Ja", "Rev",
+    "Proto", "Beta", "Unl", "Arcade", "Demo", "Sample",
+]
+TAG_PATTERNS = regex.compile(r"(?i)Alt\s*\d+|v\d+|[A-Z]{2}(?:,[A-Z]{2})+")
+
+# Characters that (?i) matching treats as i/s but str.lower() doesn't
+CASE_FOLD = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s"})
+
+if ahocorasick is not None:
+    TAG_AUTOMATON = ahocorasick.Automaton()
+    for word in TAG_WORDS:
+        TAG_AUTOMATON.add_word(word.lower(), word)
+    TAG_AUTOMATON.make_automaton()
+
+# Remove ( ... ) when it contains any of the tokens above, and any () left empty
+# by the bracket removal. BRACKETS has already removed every [...] pair, so no
+# empty [] can be left over at this point.
+PARENS_WITH_TAGS = regex.compile(
+    r"(?i)\s*\([^)]*(?:" + "|".join(TAG_TOKENS) + r")[^)]*\)"
+    r"|\(\s*\)"  # now-empty ()
 )
 
-# Characters allowed for safety on FATX: letters, digits, space, hyphen, underscore, dot
-SAFE_CHARS = re.compile(r"[^A-Za-z0-9 ._-]+")
+# One pass for all spacing cleanup: characters not allowed on FATX (anything but
+# letters, digits, space, hyphen, underscore, dot), spaces, and runs of 2+ '-'/'_'
+# all collapse into a single space
+SEPARATOR_RUNS = regex.compile(r"(?:[^A-Za-z0-9._-]|[-_]{2,})+")
+
+def has_tag(inner: str) -> bool:
+    """True if the text inside a ( ... ) group contains a tag token."""
+    return (next(TAG_AUTOMATON.iter(inner.translate(CASE_FOLD).lower()), None) is not None
+            or TAG_PATTERNS.search(inner) is not None)
+
+def strip_tagged_parens(name: str) -> str:
+    """PARENS_WITH_TAGS.sub("", name), scanning ( ... ) groups with the automaton."""
+    out = []
+    last = 0  # end of the previous removal
+    i = name.find("(")
+    while i != -1:
+        j = name.find(")", i + 1)
+        if j == -1:
+            break  # no group can close from here on
+        if has_tag(name[i + 1:j]):
+            # Take the whitespace before "(" with it, but not past the last removal
+            start = i
+            while start > last and name[start - 1].isspace():
+                start -= 1
+            out.append(name[last:start])
+            last = j + 1
+        else:
+            # No tag in "(a (b)" means none in "(b)" either, but that inner group may be empty
+            k = name.rfind("(", i, j)
+            if not name[k + 1:j].strip():
+                out.append(name[last:k])
+                last = j + 1
+        i = name.find("(", j + 1)
+    out.append(name[last:])
+    return "".join(out)
 
 def tidy_base(name: str) -> str:
-    # Drop bracket & taggy parentheses
+    # Drop bracket tags, then taggy or empty parentheses
     name = BRACKETS.sub("", name)
-    name = PARENS_WITH_TAGS.sub("", name)
-    # Remove now-empty () or []
-    name = re.sub(r"\(\s*\)|\[\s*\]", "", name)
-    # Replace forbidden chars with space
-    name = SAFE_CHARS.sub(" ", name)
-    # Normalize punctuation/spacing
-    name = re.sub(r"[,/]+", " ", name)
-    name = re.sub(r"[-_]{2,}", " ", name)
-    name = re.sub(r"\s{2,}", " ", name)
+    if ahocorasick is not None:
+        name = strip_tagged_parens(name)
+    else:
+        name = PARENS_WITH_TAGS.sub("", name)
+    # Replace forbidden chars with space and normalize punctuation/spacing
+    name = SEPARATOR_RUNS.sub(" ", name)
     # Trim edges
     name = name.strip(" .-_")
     # Fallback if empty
@@ -78,8 +140,19 @@ def unique_path(dirpath: str, base: str, ext: str) -> str:
             return candidate
         i += 1
 
+# Each file is renamed within its own directory, so rename by that directory's fd
+USE_DIR_FD = hasattr(os, "fwalk") and os.rename in os.supports_dir_fd
+
+def walk(top: str):
+    """os.walk that also yields each directory's fd (None without dir_fd support)."""
+    if USE_DIR_FD:
+        yield from os.fwalk(top)
+    else:
+        for dirpath, dirnames, files in os.walk(top):
+            yield dirpath, dirnames, files, None
+
 count = 0
-for root, _, files in os.walk(BASE_DIR):
+for root, _, files, dir_fd in walk(BASE_DIR):
     for fname in files:
         base, ext = os.path.splitext(fname)
         new_base = tidy_base(base)
@@ -90,7 +163,10 @@ for root, _, files in os.walk(BASE_DIR):
         new_path = unique_path(root, new_base, ext)
         if old_path != new_path:
             try:
-                os.rename(old_path, new_path)
+                if dir_fd is None:
+                    os.rename(old_path, new_path)
+                else:
+                    os.rename(fname, os.path.basename(new_path), src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
                 print(f"Renamed: {fname} -> {os.path.basename(new_path)}")
                 count += 1
             except Exception as e:
@@ -9,15 +9,22 @@ Extract .zip, .rar, .7z, .tar, .gz, .bz2, .xz archives in place (into the same f
 Requires:
   sudo apt install p7zip-full p7zip-rar unrar unzip tar gzip bzip2 xz-utils
   pip install patool rarfile py7zr
+Optional (ZIPs using methods zipfile can't decode, e.g. Deflate64; needs the system libarchive):
+  pip install libarchive-c
 """
 
 import argparse
+import contextlib
+import io
 import os
 import re
+import struct
 import sys
 import zipfile
 import shutil
 import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 # Optional backends
 try:
@@ -33,6 +40,20 @@ try:
 except Exception:
     patoolib = None
 
+try:
+    import libarchive
+except Exception:
+    libarchive = None
+
+# Stream entries through a fixed buffer so peak memory stays flat for huge members
+COPY_BUFSIZE = 8 * 1024 * 1024
+
+# Compression methods zipfile can decode; other ZIPs (e.g. Deflate64) go to libarchive
+ZIPFILE_METHODS = {zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2, zipfile.ZIP_LZMA}
+
+# Anything main() should hand to a worker (exact type is decided in extract_dir)
+ARCHIVE_NAME = re.compile(r"\.(zip|rar|r\d{2}|7z|tar|gz|bz2|xz)$", re.IGNORECASE)
+
 
 def is_first_rar_volume(filename: str, dirpath: str = ".") -> bool:
     """Return True if filename looks like the FIRST volume of a RAR set."""
@@ -50,44 +71,154 @@ def is_first_rar_volume(filename: str, dirpath: str = ".") -> bool:
     return f.endswith(".rar")
 
 
-def unique_path(dirpath: str, filename: str) -> str:
-    """Return a path that doesn't exist by appending _N if needed."""
-    path = os.path.join(dirpath, filename)
-    if not os.path.exists(path):
-        return path
+def existing_names(dirpath: str) -> tuple[set[str], dict[str, str]]:
+    """Names in dirpath plus a casefolded index, for unique_path (one listdir instead of a stat per candidate)."""
+    names = set(os.listdir(dirpath))
+    return names, {name.casefold(): name for name in names}
+
+
+def is_case_insensitive(dirpath: str) -> bool:
+    """Probe dirpath's filesystem with a scratch file (FAT32/exFAT, macOS and Windows fold case)."""
+    fd, path = tempfile.mkstemp(prefix=".casetest", dir=dirpath)
+    os.close(fd)
+    try:
+        return os.path.exists(os.path.join(dirpath, os.path.basename(path).upper()))
+    finally:
+        os.remove(path)
+
+
+def name_taken(dirpath: str, candidate: str, existing: tuple[set[str], dict[str, str]]) -> bool:
+    """True if writing candidate would hit a file already there or already claimed.
+
+    A name that only differs in case is the same file on case-insensitive
+    filesystems, so that (rare) case is left to the filesystem to decide.
+    """
+    names, folded = existing
+    if candidate in names:
+        return True
+    twin = folded.get(candidate.casefold())
+    if twin is None:
+        return False
+    if os.path.lexists(os.path.join(dirpath, twin)):
+        return os.path.exists(os.path.join(dirpath, candidate))
+    return is_case_insensitive(dirpath)  # twin is claimed but not written yet
+
+
+def unique_path(dirpath: str, filename: str, existing: tuple[set[str], dict[str, str]]) -> str:
+    """Return a path not in `existing` by appending _N if needed, and claim it."""
+    candidate = filename
     base, ext = os.path.splitext(filename)
     i = 1
-    while True:
-        path = os.path.join(dirpath, f"{base}_{i}{ext}")
-        if not os.path.exists(path):
-            return path
+    while name_taken(dirpath, candidate, existing):
+        candidate = f"{base}_{i}{ext}"
         i += 1
+    names, folded = existing
+    names.add(candidate)
+    folded.setdefault(candidate.casefold(), candidate)
+    return os.path.join(dirpath, candidate)
 
 
 def ensure_parent(path: str):
     os.makedirs(os.path.dirname(path), exist_ok=True)
 
 
-def safe_copy(src, dst, chunk_size=1024 * 1024):
-    """Copy data from src to dst in chunks; tolerate short reads."""
-    while True:
-        chunk = src.read(chunk_size)
-        if not chunk:
-            break
-        dst.write(chunk)
+def _stored_data_offset(fd: int, info: zipfile.ZipInfo) -> int:
+    """Offset of a member's raw bytes: its local header is 30 bytes + name + extra field."""
+    hdr = os.pread(fd, 30, info.header_offset)
+    if len(hdr) != 30 or hdr[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"bad local header for {info.filename}")
+    name_len, extra_len = struct.unpack("<HH", hdr[26:30])
+    return info.header_offset + 30 + name_len + extra_len
 
 
-def extract_zip(zip_path: str, dest_dir: str) -> int:
-    n = 0
+def _copy_stored(fd: int, info: zipfile.ZipInfo, dst) -> bool:
+    """Copy an uncompressed member with copy_file_range(2) so bytes never enter Python.
+
+    Returns False (nothing written) if the kernel/filesystem can't do it.
+    Note: unlike zf.open(), this path doesn't verify the member's CRC.
+    """
+    offset = _stored_data_offset(fd, info)
+    remaining = info.file_size
+    try:
+        while remaining:
+            n = os.copy_file_range(fd, dst.fileno(), remaining, offset_src=offset)
+            if n == 0:
+                if remaining == info.file_size:
+                    # Some kernels/filesystems (cross-fs on 5.3-5.18, FUSE, overlay,
+                    # procfs-like) return 0 rather than an errno: use a normal copy
+                    return False
+                raise zipfile.BadZipFile(f"truncated data for {info.filename}")
+            offset += n
+            remaining -= n
+    except OSError:
+        # e.g. EXDEV before Linux 5.3, ENOSYS, EOPNOTSUPP: start over with a normal copy
+        dst.seek(0)
+        dst.truncate()
+        return False
+    return True
+
+
+def _extract_zip_entries(zip_path: str, items: list[tuple[zipfile.ZipInfo, str]]):
+    """Extract (info, out_path) pairs using this thread's own ZipFile handle."""
+    # ZipFile objects aren't safe for concurrent reads, so each thread opens its own
+    with zipfile.ZipFile(zip_path) as zf:
+        fd = zf.fp.fileno()
+        for info, out_path in items:
+            with open(out_path, "wb") as dst:
+                if (hasattr(os, "copy_file_range") and info.compress_type == zipfile.ZIP_STORED
+                        and not info.flag_bits & 0x1  # not encrypted
+                        and _copy_stored(fd, info, dst)):
+                    continue
+                with zf.open(info) as src:
+                    shutil.copyfileobj(src, dst, COPY_BUFSIZE)
+
+
+def extract_zip(zip_path: str, dest_dir: str, workers: int = 1) -> int:
+    """Extract a ZIP into dest_dir, decompressing entries on up to `workers` threads."""
+    items = []
+    existing = existing_names(dest_dir)
     with zipfile.ZipFile(zip_path) as zf:
         for info in zf.infolist():
             if info.is_dir():
                 continue
+            if info.compress_type not in ZIPFILE_METHODS:
+                # Raised before anything is written, so the caller can retry with libarchive
+                raise NotImplementedError(f"{info.filename}: unsupported compression method {info.compress_type}")
             name = os.path.basename(info.filename) or "file"
-            out_path = unique_path(dest_dir, name)
+            out_path = unique_path(dest_dir, name, existing)  # names are claimed before any thread writes
+            ensure_parent(out_path)
+            items.append((info, out_path))
+
+    workers = max(1, min(workers, len(items)))
+    if workers == 1:
+        _extract_zip_entries(zip_path, items)
+    else:
+        # zlib releases the GIL while inflating, so entries decompress in parallel
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(_extract_zip_entries, [zip_path] * workers,
+                              [items[k::workers] for k in range(workers)]):
+                pass
+    return len(items)
+
+
+def extract_zip_libarchive(zip_path: str, dest_dir: str) -> int:
+    """Stream a ZIP through libarchive, for compression methods zipfile lacks."""
+    n = 0
+    existing = existing_names(dest_dir)
+    with libarchive.file_reader(zip_path) as arc:
+        for entry in arc:
+            if entry.isdir:
+                continue
+            name = os.path.basename(str(entry.pathname)) or "file"
+            out_path = unique_path(dest_dir, name, existing)
             ensure_parent(out_path)
-            with zf.open(info) as src, open(out_path, "wb") as dst:
-                safe_copy(src, dst)
+            try:
+                with open(out_path, "wb") as dst:
+                    for block in entry.get_blocks():
+                        dst.write(block)
+            except Exception:
+                os.remove(out_path)  # don't leave an empty/partial file behind
+                raise
             n += 1
     return n
 
@@ -97,6 +228,7 @@ def extract_rar(rar_path: str, dest_dir: str, password: str | None = None) -> in
     if rarfile is None:
         raise RuntimeError("rarfile not available. Install with: pip install rarfile")
     n = 0
+    existing = existing_names(dest_dir)
     try:
         with rarfile.RarFile(rar_path) as rf:
             try:
@@ -108,10 +240,10 @@ def extract_rar(rar_path: str, dest_dir: str, password: str | None = None) -> in
                 if info.isdir():
                     continue
                 name = os.path.basename(info.filename) or "file"
-                out_path = unique_path(dest_dir, name)
+                out_path = unique_path(dest_dir, name, existing)
                 ensure_parent(out_path)
                 with rf.open(info, pwd=password) as src, open(out_path, "wb") as dst:
-                    safe_copy(src, dst)
+                    shutil.copyfileobj(src, dst, COPY_BUFSIZE)
                 n += 1
     except Exception as e:
         print(f"  ⚠ rarfile failed, trying system unrar: {e}")
@@ -135,18 +267,25 @@ def extract_any(archive_path: str, dest_dir: str):
     patoolib.extract_archive(archive_path, outdir=dest_dir, verbosity=-1)
 
 
-def main():
-    ap = argparse.ArgumentParser(description="Extract archives in place (recursive, flatten paths).")
-    ap.add_argument("root", nargs="?", default=".", help="Root folder to scan (default: current dir)")
-    ap.add_argument("-p", "--password", default=None, help="Password for encrypted RARs (optional)")
-    ap.add_argument("--delete", action="store_true", help="Delete archives after successful extraction")
-    args = ap.parse_args()
+def zip_threads(jobs: int) -> int:
+    """Threads per ZIP, sharing the CPUs with the other worker processes.
 
-    root = os.path.abspath(args.root)
-    total_archives = total_files = errors = 0
+    Each thread holds a COPY_BUFSIZE buffer, so jobs x jobs threads would
+    oversubscribe the CPU and memory alike.
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, jobs))
+
+
+def extract_dir(dirpath: str, fnames: list[str], args: argparse.Namespace) -> tuple[int, int, int, str]:
+    """Extract every archive in one folder, in name order (runs in a worker process).
 
-    for dirpath, _, files in os.walk(root):
-        for fname in sorted(files):
+    Archives sharing a folder are handled serially so _N collision suffixes stay
+    deterministic. Returns (archives, files, errors, captured output).
+    """
+    total_archives = total_files = errors = 0
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        for fname in fnames:
             low = fname.lower()
             full = os.path.join(dirpath, fname)
 
@@ -154,7 +293,13 @@ def main():
                 if low.endswith(".zip"):
                     total_archives += 1
                     print(f"\nZIP: {full}")
-                    extracted = extract_zip(full, dirpath)
+                    try:
+                        extracted = extract_zip(full, dirpath, workers=zip_threads(args.jobs))
+                    except NotImplementedError as e:
+                        if libarchive is None:
+                            raise RuntimeError(f"{e} (pip install libarchive-c to extract it)") from e
+                        print(f"  zipfile can't decode it ({e}); using libarchive")
+                        extracted = extract_zip_libarchive(full, dirpath)
                     print(f"  -> extracted {extracted} file(s)")
                     total_files += extracted
                     if args.delete:
@@ -186,11 +331,36 @@ def main():
                 errors += 1
                 print(f"  ERROR: {e}")
 
-    print(f"\nSummary: archives processed={total_archives}, files extracted≈{total_files}, errors={errors}")
+    return total_archives, total_files, errors, out.getvalue()
 
 
-if __name__ == "__main__":
-    main()
+def main():
+    ap = argparse.ArgumentParser(description="Extract archives in place (recursive, flatten paths).")
+    ap.add_argument("root", nargs="?", default=".", help="Root folder to scan (default: current dir)")
+    ap.add_argument("-p", "--password", default=None, help="Password for encrypted RARs (optional)")
+    ap.add_argument("--delete", action="store_true", help="Delete archives after successful extraction")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                    help="Folders extracted in parallel (default: CPU count); each ZIP gets CPU count / N threads")
+    args = ap.parse_args()
+
+    root = os.path.abspath(args.root)
+    total_archives = total_files = errors = 0
+
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = []
+        for dirpath, _, files in os.walk(root):
+            archives = [f for f in sorted(files) if ARCHIVE_NAME.search(f)]
+            if archives:
+                futures.append(pool.submit(extract_dir, dirpath, archives, args))
+
+        for fut in as_completed(futures):
+            archives, extracted, failed, output = fut.result()
+            sys.stdout.write(output)
+            total_archives += archives
+            total_files += extracted
+            errors += failed
+
+    print(f"\nSummary: archives processed={total_archives}, files extracted≈{total_files}, errors={errors}")
 
 
 if __name__ == "__main__":